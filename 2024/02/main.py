@@ -1,5 +1,6 @@
 from enum import Enum
 from itertools import pairwise
+from operator import and_, or_, sub
 from typing import List
 from unittest import TestCase
 import sys
@@ -34,26 +35,131 @@ class ReportChecker:
         return diff >= 1 and diff <= 3
 
 class ProblemDampenerReportChecker(ReportChecker):
+    tolerance: int
+
+    def __init__(self, tolerance: int = 1):
+        super().__init__()
+        self.tolerance = tolerance
+
     def is_safe_report(self, report: List[int]) -> bool:
-        for i in range(len(report)):
-            if super().is_safe_report(report[:i] + report[i + 1:]):
+        return any(
+            self.is_safe_in_direction(report, direction)
+            for direction in Direction
+        )
+
+    def is_safe_in_direction(self, report: List[int], direction: Direction) -> bool:
+        """
+        Check if the report can be made safe in one direction by removing at
+        most `tolerance` levels. For each level, we track the fewest removals
+        needed to keep a safe sequence that ends on that level. A level can
+        only follow one of the `tolerance + 1` levels before it, so this is a
+        single linear pass for a fixed tolerance.
+        """
+        removals = []
+        for i, current in enumerate(report):
+            # Removing every level before this one is always an option.
+            fewest = i
+            for j in range(max(0, i - self.tolerance - 1), i):
+                if self.is_safe_increment(report[j], current, direction):
+                    fewest = min(fewest, removals[j] + i - j - 1)
+            removals.append(fewest)
+
+            # Removing every level after this one.
+            if fewest + len(report) - i - 1 <= self.tolerance:
                 return True
         return False
 
+SAFE_INCREASES = frozenset([1, 2, 3])
+SAFE_DECREASES = frozenset([-1, -2, -3])
+
+class BatchReportChecker:
+    """
+    Checks many reports at once. The reports are packed into columns, padded
+    to the length of the longest report, and each check is applied to a whole
+    column of differences at a time.
+    """
+    columns: List[List[int]]
+    lengths: List[int]
+
+    def __init__(self, reports: List[List[int]]):
+        width = max((len(report) for report in reports), default=0)
+        self.lengths = [len(report) for report in reports]
+        self.columns = [
+            [report[i] if i < len(report) else 0 for report in reports]
+            for i in range(width)
+        ]
+
+    def get_safe_reports(self) -> List[bool]:
+        increasing = [True] * len(self.lengths)
+        decreasing = [True] * len(self.lengths)
+        for i, (previous, current) in enumerate(pairwise(self.columns)):
+            # Differences past the end of a report are padding, and are always
+            # treated as safe.
+            padding = [length <= i + 1 for length in self.lengths]
+            diffs = list(map(sub, current, previous))
+            increases = map(or_, map(SAFE_INCREASES.__contains__, diffs), padding)
+            decreases = map(or_, map(SAFE_DECREASES.__contains__, diffs), padding)
+            increasing = list(map(and_, increasing, increases))
+            decreasing = list(map(and_, decreasing, decreases))
+        return list(map(or_, increasing, decreasing))
+
+    def count_safe(self) -> int:
+        return sum(self.get_safe_reports())
+
+    def get_dampened_safe_reports(self, safe_diffs: frozenset, tolerance: int) -> List[bool]:
+        """
+        Check which reports can be made safe in one direction by removing at
+        most `tolerance` levels. This is the same pass as
+        ProblemDampenerReportChecker.is_safe_in_direction, tracking the fewest
+        removals needed to keep a safe sequence ending on each column, for
+        every report at once.
+        """
+        safe = [False] * len(self.lengths)
+        removals = []
+        for i, current in enumerate(self.columns):
+            # Removing every level before this one is always an option.
+            fewest = [i] * len(self.lengths)
+            for j in range(max(0, i - tolerance - 1), i):
+                skipped = i - j - 1
+                safe_increments = map(safe_diffs.__contains__, map(sub, current, self.columns[j]))
+                fewest = [
+                    min(count, previous + skipped) if safe_increment else count
+                    for count, previous, safe_increment in zip(fewest, removals[j], safe_increments)
+                ]
+            removals.append(fewest)
+
+            # Removing every level after this one, for reports that don't end
+            # before this column.
+            safe = [
+                is_safe or (i < length and count + length - i - 1 <= tolerance)
+                for is_safe, count, length in zip(safe, fewest, self.lengths)
+            ]
+        return safe
+
+    def count_dampened_safe(self, tolerance: int = 1) -> int:
+        """
+        Count the reports that are safe once at most `tolerance` levels are
+        removed.
+        """
+        return sum(map(
+            or_,
+            self.get_dampened_safe_reports(SAFE_INCREASES, tolerance),
+            self.get_dampened_safe_reports(SAFE_DECREASES, tolerance),
+        ))
+
 def main():
-    report_checker = ReportChecker()
-    problem_dampener_report_checker = ProblemDampenerReportChecker()
+    reports = [
+        [int(level) for level in line.split()]
+        for line in sys.stdin
+        if line.strip()
+    ]
+    batch_checker = BatchReportChecker(reports)
 
-    for line in sys.stdin:
-        report = [int(level) for level in line.split()]
-        report_checker.check_report(report)
-        problem_dampener_report_checker.check_report(report)
+    safe = batch_checker.count_safe()
+    print(f"[Part one] {safe} safe reports, {len(reports) - safe} unsafe reports")
 
-    print(f"[Part one] {report_checker.safe} safe reports, {report_checker.unsafe} unsafe reports")
-    print(
-        f"[Part two] {problem_dampener_report_checker.safe} safe reports, "
-        f"{problem_dampener_report_checker.unsafe} unsafe reports"
-    )
+    safe = batch_checker.count_dampened_safe()
+    print(f"[Part two] {safe} safe reports, {len(reports) - safe} unsafe reports")
 
 
 class IsSafeIncrementTestCase(TestCase):
@@ -139,5 +245,54 @@ class IsProblemDampenerSafeReportTestCase(TestCase):
         # Unsafe regardless of which level is removed.
         self.assertFalse(self.checker.is_safe_report([9, 7, 6, 2, 1]))
 
+    def test_tolerance(self):
+        checker = ProblemDampenerReportChecker(tolerance=2)
+
+        # Safe by removing the third and fourth levels, 9 and 2.
+        self.assertTrue(checker.is_safe_report([1, 2, 9, 2, 3, 4]))
+
+        # Safe by removing the first two levels, 9 and 1.
+        self.assertTrue(checker.is_safe_report([9, 1, 5, 6, 7]))
+
+        # Unsafe since three levels would need to be removed.
+        self.assertFalse(checker.is_safe_report([1, 9, 2, 9, 3, 9, 4]))
+
+    def test_no_tolerance(self):
+        checker = ProblemDampenerReportChecker(tolerance=0)
+        self.assertTrue(checker.is_safe_report([7, 6, 4, 2, 1]))
+        self.assertFalse(checker.is_safe_report([1, 3, 2, 4, 5]))
+
+class BatchReportCheckerTestCase(TestCase):
+    def setUp(self):
+        self.reports = [
+            [7, 6, 4, 2, 1],
+            [1, 2, 7, 8, 9],
+            [9, 7, 6, 2, 1],
+            [1, 3, 2, 4, 5],
+            [8, 6, 4, 4, 1],
+            [1, 3, 6, 7, 9],
+            [1, 9, 2, 3],
+            [5, 4],
+        ]
+        self.checker = BatchReportChecker(self.reports)
+
+    def test_count_safe(self):
+        checker = ReportChecker()
+        for report in self.reports:
+            checker.check_report(report)
+        self.assertEqual(self.checker.count_safe(), checker.safe)
+
+    def test_count_dampened_safe(self):
+        checker = ProblemDampenerReportChecker()
+        for report in self.reports:
+            checker.check_report(report)
+        self.assertEqual(self.checker.count_dampened_safe(), checker.safe)
+
+    def test_count_dampened_safe_with_tolerance(self):
+        checker = ProblemDampenerReportChecker(tolerance=2)
+        for report in self.reports:
+            checker.check_report(report)
+        self.assertEqual(self.checker.count_dampened_safe(tolerance=2), checker.safe)
+
 if __name__ == "__main__":
     main()
@@ -1,39 +1,133 @@
+import os
 import sys
 import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+# The operands of a mul instruction are at most three digits long, so no
+# instruction is longer than "mul(123,456)".
+PATTERN = re.compile(rb"mul\((\d{1,3}),(\d{1,3})\)|do\(\)|don't\(\)")
+OVERLAP = len("mul(123,456)") - 1
+
+CHUNK_SIZE = 1 << 20
 
 def main():
-    input_memory = sys.stdin.read()
+    # A file given as an argument is split between worker processes,
+    # otherwise the memory is streamed from stdin.
+    if len(sys.argv) > 1:
+        total, enabled_total = scan_file(sys.argv[1], os.cpu_count() or 1)
+    else:
+        total, enabled_total = scan_stream(sys.stdin.buffer)
+
+    print(f"[Part one] Result {total}")
+    print(f"[Part two] Result {enabled_total}")
 
-    part_one(input_memory)
-    part_two(input_memory)
+@dataclass
+class ChunkResult:
+    """
+    The totals for one chunk of memory. Whether multiplication is enabled at
+    the start of a chunk depends on the chunks before it, so the total for
+    part two is kept for both cases until the chunks are combined.
+    """
+    total: int = 0
+    total_if_enabled: int = 0
+    total_if_disabled: int = 0
+    # The last do() or don't() in the chunk, or None if there wasn't one.
+    final_state: bool | None = None
 
-def part_one(input_memory):
-    pattern = re.compile(r"mul\((\d+),(\d+)\)")
+def scan_chunk(data: bytes, limit: int) -> ChunkResult:
+    """
+    Scan a chunk of memory for instructions. Only instructions that start
+    before the limit belong to this chunk, the data after it is only there to
+    complete an instruction that crosses into the next chunk.
+    """
+    result = ChunkResult()
+    enabled_from_start = True
+    disabled_from_start = False
+    for match in PATTERN.finditer(data):
+        if match.start() >= limit:
+            break
 
-    total = 0
-    for match in pattern.finditer(input_memory):
-        a, b = match.groups()
-        total += int(a) * int(b)
+        instruction = match.group(0)
+        if instruction == b"do()":
+            enabled_from_start = disabled_from_start = True
+            result.final_state = True
+        elif instruction == b"don't()":
+            enabled_from_start = disabled_from_start = False
+            result.final_state = False
+        else:
+            a, b = match.groups()
+            product = int(a) * int(b)
+            result.total += product
+            if enabled_from_start:
+                result.total_if_enabled += product
+            if disabled_from_start:
+                result.total_if_disabled += product
 
-    print(f"[Part one] Result {total}")
+    return result
+
+@dataclass
+class Totals:
+    """
+    The running totals for both parts, as chunk results are added in order.
+    """
+    total: int = 0
+    enabled_total: int = 0
+    enabled: bool = True
+
+    def add(self, result: ChunkResult) -> None:
+        self.total += result.total
+        if self.enabled:
+            self.enabled_total += result.total_if_enabled
+        else:
+            self.enabled_total += result.total_if_disabled
+
+        # Carry the enabled state into the next chunk.
+        if result.final_state is not None:
+            self.enabled = result.final_state
+
+def scan_stream(stream, chunk_size: int=CHUNK_SIZE) -> tuple[int, int]:
+    """
+    Scan a binary stream one chunk at a time, so only two chunks are ever held
+    in memory. Returns the totals for both parts.
+    """
+    # Each chunk must be long enough to finish an instruction from the
+    # previous chunk.
+    chunk_size = max(chunk_size, OVERLAP)
+    totals = Totals()
+    chunk = stream.read(chunk_size)
+    while chunk:
+        next_chunk = stream.read(chunk_size)
+        totals.add(scan_chunk(chunk + next_chunk[:OVERLAP], len(chunk)))
+        chunk = next_chunk
+
+    return totals.total, totals.enabled_total
+
+def scan_file_chunk(path: str, start: int, size: int) -> ChunkResult:
+    with open(path, "rb") as file:
+        file.seek(start)
+        data = file.read(size + OVERLAP)
+    return scan_chunk(data, size)
+
+def scan_file(path: str, workers: int, chunk_size: int=CHUNK_SIZE) -> tuple[int, int]:
+    """
+    Scan a file by splitting it into chunks that are scanned by separate
+    worker processes. Each worker reads its own chunk, plus enough of the next
+    one to finish any instruction that crosses the boundary.
+    """
+    file_size = os.path.getsize(path)
+    starts = range(0, file_size, chunk_size)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        totals = Totals()
+        for result in executor.map(
+            scan_file_chunk,
+            [path] * len(starts),
+            starts,
+            [chunk_size] * len(starts),
+        ):
+            totals.add(result)
 
-def part_two(input_memory):
-    pattern = re.compile(r"(mul|do|don't)\(((\d+),(\d+)|)\)")
-
-    total = 0
-    multiply_enabled = True
-    for match in pattern.finditer(input_memory):
-        op = match.group(1)
-        if op == "mul":
-            if multiply_enabled:
-                _, _, a, b = match.groups()
-                total += int(a) * int(b)
-        elif op == "do":
-            multiply_enabled = True
-        elif op == "don't":
-            multiply_enabled = False
-
-    print(f"[Part two] Result {total}")
+    return totals.total, totals.enabled_total
 
 
 if __name__ == "__main__":
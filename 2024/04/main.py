@@ -95,11 +95,103 @@ class Grid:
 
 
 
+class MaskGrid:
+    """
+    The cross word stored as one bit mask per letter, over the rows laid out
+    end to end. Checking a letter at the same offset from every cell at once
+    is then a single shift of that letter's mask. Each row is padded with
+    empty columns so words can't wrap from one row onto the next, and the
+    masks are rebuilt with more padding when a longer word is searched for.
+    """
+    grid: List[str]
+    masks: dict[str, int]
+    stride: int
+    padding: int
+
+    def __init__(self, grid: List[str]) -> None:
+        self.grid = grid
+        self.build_masks(0)
+
+    def build_masks(self, padding: int) -> None:
+        self.padding = padding
+        self.stride = len(self.grid[0]) + padding
+        self.masks = {}
+        for y, line in enumerate(self.grid):
+            for x, letter in enumerate(line):
+                bit = 1 << (y * self.stride + x)
+                self.masks[letter] = self.masks.get(letter, 0) | bit
+
+    def fit_word(self, word: str) -> None:
+        """
+        Make sure the rows are padded enough that the word can't wrap onto the
+        next row.
+        """
+        if len(word) - 1 > self.padding:
+            self.build_masks(len(word) - 1)
+
+    def offset(self, direction: Tuple[int, int]) -> int:
+        dx, dy = direction
+        return dy * self.stride + dx
+
+    def shift(self, mask: int, offset: int) -> int:
+        """
+        Move every bit in the mask from position i + offset to position i.
+        """
+        return mask >> offset if offset >= 0 else mask << -offset
+
+    def match(self, word: str, direction: Tuple[int, int]) -> int:
+        """
+        Get a mask of every cell the word starts on, going in a direction.
+        """
+        self.fit_word(word)
+        offset = self.offset(direction)
+        result = -1
+        for i, letter in enumerate(word):
+            result &= self.shift(self.masks.get(letter, 0), i * offset)
+        return result
+
+    def count_word(self, word: str) -> int:
+        """
+        Count the number of times a word appears in the cross word, in any
+        direction.
+        """
+        directions = [
+            (dx, dy)
+            for dx in [-1, 0, 1]
+            for dy in [-1, 0, 1]
+            if (dx, dy) != (0, 0)
+        ]
+        return sum(
+            self.match(word, direction).bit_count()
+            for direction in directions
+        )
+
+    def count_x_word(self, word: str) -> int:
+        """
+        Count the number of times two diagonal copies of a word form an X, each
+        written in either direction, crossing at the middle letter.
+        """
+        if len(word) % 2 == 0:
+            raise ValueError(f"Word {word} has no middle letter")
+
+        self.fit_word(word)
+        middle = len(word) // 2
+        centers = -1
+        for dx, dy in [(1, 1), (1, -1)]:
+            diagonal = 0
+            for direction in [(dx, dy), (-dx, -dy)]:
+                # Move each match from the first letter to the middle letter.
+                offset = self.offset(direction) * middle
+                diagonal |= self.shift(self.match(word, direction), -offset)
+            centers &= diagonal
+        return centers.bit_count()
+
+
 def main():
-    grid = Grid([line.strip() for line in sys.stdin.readlines()])
+    grid = MaskGrid([line.strip() for line in sys.stdin.readlines()])
 
-    print(f"[Part one] XMAS count: {grid.count_xmas()}")
-    print(f"[Part two] XMAS count: {grid.count_x_mas()}")
+    print(f"[Part one] XMAS count: {grid.count_word('XMAS')}")
+    print(f"[Part two] XMAS count: {grid.count_x_word('MAS')}")
 
 
 if __name__ == "__main__":
@@ -1,31 +1,59 @@
 import sys
 from collections import defaultdict
+from functools import cmp_to_key
+from itertools import combinations
 
 class OrderingRuleChecker:
     ordering_rules: dict[int, set[int]]
     reverse_rules: dict[int, set[int]]
+    precedence: set[tuple[int, int]]
 
     def __init__(self, ordering_rules: dict[int, set[int]]) -> None:
         self.ordering_rules = ordering_rules
 
+        # Compile the rules into a set of (before, after) pairs once, so any two
+        # pages can be compared with a single lookup.
+        self.precedence = {
+            (before, after)
+            for before, afters in ordering_rules.items()
+            for after in afters
+        }
+
+    def compare(self, a: int, b: int) -> int:
+        if (a, b) in self.precedence:
+            return -1
+        if (b, a) in self.precedence:
+            return 1
+        return 0
+
     def is_ordered(self, values: list[int]) -> bool:
-        for i, value in enumerate(values):
-            for after in values[i+1:]:
-                if after not in self.ordering_rules[value]:
-                    return False
-        return True
+        return all(
+            (before, after) in self.precedence
+            for before, after in combinations(values, 2)
+        )
 
     def reorder(self, values: list[int]) -> list[int]:
-        result = []
-        values = set(values)
-        while values:
-            for value in values:
-                # Find the value that has all other values on the right side.
-                if values - self.ordering_rules[value] == {value}:
-                    result.append(value)
-                    values.remove(value)
-                    break
-        return result
+        return sorted(values, key=cmp_to_key(self.compare))
+
+    def middle(self, values: list[int]) -> int:
+        """
+        Find the page that would be in the middle of the update once it's
+        reordered, without sorting the whole update. This uses quickselect with
+        the rules as the comparison.
+        """
+        target = len(values) // 2
+        values = list(values)
+        while True:
+            pivot = values[len(values) // 2]
+            before = [value for value in values if self.compare(value, pivot) < 0]
+            after = [value for value in values if self.compare(value, pivot) > 0]
+            if target < len(before):
+                values = before
+            elif target >= len(values) - len(after):
+                target -= len(values) - len(after)
+                values = after
+            else:
+                return pivot
 
 def main():
     ordering_rules = defaultdict(set)
@@ -45,8 +73,7 @@ def main():
         if checker.is_ordered(values):
             correct_results += values[int(len(values)/2)]
         else:
-            values = checker.reorder(values)
-            fixed_results += values[int(len(values)/2)]
+            fixed_results += checker.middle(values)
 
     print(f"[Part one] Correct result {correct_results}")
     print(f"[Part two] Fixed result {fixed_results}")
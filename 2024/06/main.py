@@ -1,3 +1,5 @@
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
 from functools import cache
 import sys
 from enum import Enum
@@ -59,11 +61,76 @@ class Direction(Enum):
     def to_char(self) -> str:
         return self.value
 
+class ObstructionIndex:
+    """
+    Sorted obstruction coordinates for every row and column of the map. This
+    lets the guard jump straight to the next obstruction in its path, instead
+    of walking there one cell at a time.
+    """
+    rows: list[list[int]]
+    columns: list[list[int]]
+
+    def __init__(self, lines: list[list[str]]) -> None:
+        self.rows = [[] for _ in lines]
+        self.columns = [[] for _ in lines[0]]
+        for y, line in enumerate(lines):
+            for x, char in enumerate(line):
+                if char == "#":
+                    self.rows[y].append(x)
+                    self.columns[x].append(y)
+
+    def next_stop(
+        self,
+        position: Position,
+        direction: Direction,
+        extra: Position | None=None,
+    ) -> Position | None:
+        """
+        Find the position the guard stops at in front of the next obstruction,
+        or None if the guard walks off the map. An optional extra obstruction
+        is taken into account without having to modify the index.
+        """
+        x, y = position.x, position.y
+        match direction:
+            case Direction.RIGHT:
+                stop = self.first_after(self.rows[y], x)
+                if extra is not None and extra.y == y and extra.x > x:
+                    stop = extra.x if stop is None else min(stop, extra.x)
+                return None if stop is None else Position(stop - 1, y)
+            case Direction.LEFT:
+                stop = self.last_before(self.rows[y], x)
+                if extra is not None and extra.y == y and extra.x < x:
+                    stop = extra.x if stop is None else max(stop, extra.x)
+                return None if stop is None else Position(stop + 1, y)
+            case Direction.DOWN:
+                stop = self.first_after(self.columns[x], y)
+                if extra is not None and extra.x == x and extra.y > y:
+                    stop = extra.y if stop is None else min(stop, extra.y)
+                return None if stop is None else Position(x, stop - 1)
+            case Direction.UP:
+                stop = self.last_before(self.columns[x], y)
+                if extra is not None and extra.x == x and extra.y < y:
+                    stop = extra.y if stop is None else max(stop, extra.y)
+                return None if stop is None else Position(x, stop + 1)
+            case v:
+                raise ValueError(f"Invalid direction {v}")
+
+    @classmethod
+    def first_after(cls, values: list[int], value: int) -> int | None:
+        i = bisect_right(values, value)
+        return values[i] if i < len(values) else None
+
+    @classmethod
+    def last_before(cls, values: list[int], value: int) -> int | None:
+        i = bisect_left(values, value)
+        return values[i - 1] if i > 0 else None
+
 class Map:
     lines: list[list[str]]
     position: Position
     direction: Direction
     visited: set[tuple[Position, Direction]]
+    trajectory: list[tuple[Position, Direction]]
 
     def __init__(
         self,
@@ -73,6 +140,7 @@ class Map:
     ) -> None:
         self.lines = lines
         self.visited = set()
+        self.trajectory = []
 
         if position:
             self.position = position
@@ -107,12 +175,48 @@ class Map:
     def is_obstruction(self, position: Position):
         return self.get_char(position) == "#"
 
+    @cache
+    def get_obstruction_index(self) -> ObstructionIndex:
+        return ObstructionIndex(self.lines)
+
+    def simulate_jumps(
+        self,
+        extra: Position | None=None,
+        position: Position | None=None,
+        direction: Direction | None=None,
+    ) -> None:
+        """
+        Simulate the guard's path by jumping from one turn to the next, with an
+        optional extra obstruction overlaid on the map. The walk starts from the
+        given state, or from the guard's initial state if none is given. Only
+        the turns are recorded, which is enough to detect a loop. Unlike
+        simulate(), this doesn't update the map's state.
+        """
+        index = self.get_obstruction_index()
+        if position is None:
+            position = self.get_initial_position()
+        if direction is None:
+            direction = self.get_initial_direction()
+        turns = set()
+        while True:
+            stop = index.next_stop(position, direction, extra)
+            if stop is None:
+                break
+
+            if (stop, direction) in turns:
+                raise LoopError("Loop detected in guards path")
+
+            turns.add((stop, direction))
+            position = stop
+            direction = direction.turn_right()
+
     def simulate(self) -> None:
         while True:
             if (self.position, self.direction) in self.visited:
                 raise LoopError("Loop detected in guards path")
 
             self.visited.add((self.position, self.direction))
+            self.trajectory.append((self.position, self.direction))
 
             position = self.direction.move(self.position)
             if not self.is_in_bounds(position):
@@ -134,24 +238,49 @@ class Map:
 
         return len({pos for pos, _ in self.visited})
 
-    def count_loopers(self) -> int:
+    def count_loopers(self, workers: int=1) -> int:
+        """
+        Count the number of positions where adding an obstruction would trap
+        the guard in a loop. With more than one worker, the candidate
+        positions are split into shards and checked in separate processes.
+        """
         if len(self.visited) == 0:
             raise ValueError("Simulation hasn't been run yet")
 
+        # Each candidate resumes from the state just before the guard first
+        # walks into it, since the path up to that point is unchanged by the
+        # new obstruction.
+        candidates = []
+        seen = {self.get_initial_position()}
+        for position, direction in self.trajectory:
+            obstruction = direction.move(position)
+            if obstruction in seen or not self.is_in_bounds(obstruction):
+                continue
+            seen.add(obstruction)
+            if not self.is_obstruction(obstruction):
+                candidates.append((obstruction, position, direction))
+
+        if workers <= 1:
+            return self.count_loops(candidates)
+
+        shards = [candidates[i::workers] for i in range(workers)]
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=init_worker,
+            initargs=(self.lines,),
+        ) as executor:
+            return sum(executor.map(count_worker_loops, shards))
+
+    def count_loops(
+        self,
+        candidates: list[tuple[Position, Position, Direction]],
+    ) -> int:
         count = 0
-        obstructions = {
-            direction.move(position)
-            for position, direction in self.visited
-        }
-        obstructions.remove(self.get_initial_position())
-        for position in obstructions:
+        for obstruction, position, direction in candidates:
             try:
-                if self.is_in_bounds(position):
-                    new_map = self.with_extra_obstruction(position)
-                    new_map.simulate()
+                self.simulate_jumps(obstruction, position, direction)
             except LoopError:
                 count += 1
-
         return count
 
     def render(self) -> str:
@@ -160,14 +289,19 @@ class Map:
             lines[pos.y][pos.x] = direction.to_char()
         return "\n".join(["".join(line) for line in lines])
 
-    def with_extra_obstruction(self, position: Position):
-        lines = [[char for char in line] for line in self.lines]
-        lines[position.y][position.x] = "#"
-        return Map(
-            lines=lines,
-            position=self.get_initial_position(),
-            direction=self.get_initial_direction(),
-        )
+
+# The map shared by every candidate checked in a worker process. This is only
+# set up once per worker, so the grid isn't sent along with every shard.
+worker_map: Map | None = None
+
+def init_worker(lines: list[list[str]]) -> None:
+    global worker_map
+    worker_map = Map(lines)
+
+def count_worker_loops(
+    candidates: list[tuple[Position, Position, Direction]],
+) -> int:
+    return worker_map.count_loops(candidates)
 
 
 def main():
@@ -1,5 +1,4 @@
 import sys
-from itertools import product
 
 def main():
     lines = []
@@ -23,21 +22,58 @@ def main():
     )
     print(f"[Part two] Calibration results {result}")
 
-def is_valid_equation(expected: int, inputs: list[str], operators: list[str]) -> bool:
-    for operators in product(operators, repeat=len(inputs) - 1):
-        values = list(reversed(inputs))
-        for operator in operators:
-            a = values.pop()
-            b = values.pop()
-            if operator == "+":
-                values.append(a + b)
-            elif operator == "*":
-                values.append(a * b)
-            elif operator == "||":
-                values.append(int(str(a) + str(b)))
-
-        if values[0] == expected:
-            return True
+def undo_add(expected: int, value: int) -> int | None:
+    if expected < value:
+        return None
+    return expected - value
+
+def undo_multiply(expected: int, value: int) -> int | None:
+    # Calibration inputs are always positive, so a zero operand can't occur.
+    if value == 0 or expected % value != 0:
+        return None
+    return expected // value
+
+def undo_concatenate(expected: int, value: int) -> int | None:
+    # Find the power of ten that shifts the left operand past the digits of the
+    # right operand.
+    shift = 10
+    while shift <= value:
+        shift *= 10
+
+    if expected < value or (expected - value) % shift != 0:
+        return None
+    return expected // shift
+
+# For each operator, a function that takes the result of the operation and its
+# right operand, and returns the left operand, or None if no left operand could
+# produce that result.
+INVERSE_OPERATORS = {
+    "+": undo_add,
+    "*": undo_multiply,
+    "||": undo_concatenate,
+}
+
+def is_valid_equation(expected: int, inputs: list[int], operators: list[str]) -> bool:
+    """
+    Check if the inputs can be combined with the given operators, evaluated
+    from left to right, to produce the expected value. This works backwards
+    from the expected value, undoing one operator at a time, so branches that
+    can't produce the result are rejected as early as possible.
+    """
+    inverses = [INVERSE_OPERATORS[operator] for operator in operators]
+
+    def solve(expected: int, count: int) -> bool:
+        if count == 1:
+            return expected == inputs[0]
+
+        value = inputs[count - 1]
+        for inverse in inverses:
+            remaining = inverse(expected, value)
+            if remaining is not None and solve(remaining, count - 1):
+                return True
+        return False
+
+    return solve(expected, len(inputs))
 
 if __name__ == "__main__":
     main()
@@ -1,6 +1,7 @@
 from dataclasses import dataclass
 from collections import defaultdict
-from itertools import count, permutations
+from itertools import combinations, count, permutations
+from math import gcd
 import sys
 
 @dataclass(frozen=True)
@@ -66,14 +67,53 @@ class TowerMap:
                         antinodes.add(pos)
         return antinodes
 
+    def get_antinode_bitmap_with_resonant_harmonics(self) -> bytearray:
+        """
+        Get the antinodes with resonant harmonics as a flat bitmap of the grid,
+        with one byte per position. Each pair of towers is only walked once,
+        along the smallest step that stays on the line between them, and the
+        range of steps that stays on the map is calculated up front.
+        """
+        width, height = self.bounds
+        bitmap = bytearray(width * height)
+        for char, positions in self.get_towers().items():
+            for a, b in combinations(positions, 2):
+                dx = b.x - a.x
+                dy = b.y - a.y
+                divisor = gcd(dx, dy)
+                dx //= divisor
+                dy //= divisor
+
+                x_low, x_high = step_range(a.x, dx, width)
+                y_low, y_high = step_range(a.y, dy, height)
+                start = a.y * width + a.x
+                step = dy * width + dx
+                for i in range(max(x_low, y_low), min(x_high, y_high) + 1):
+                    bitmap[start + i * step] = 1
+        return bitmap
+
+def step_range(start: int, step: int, size: int) -> tuple[int, int]:
+    """
+    Find the lowest and highest number of steps from the start that stay
+    within 0 and size - 1 on a single axis.
+    """
+    if step > 0:
+        return -(start // step), (size - 1 - start) // step
+    elif step < 0:
+        return -((size - 1 - start) // -step), start // -step
+    else:
+        # The position never changes on this axis, so any number of steps
+        # stays within it.
+        return -sys.maxsize, sys.maxsize
+
 def main():
     grid = [line.strip() for line in sys.stdin.readlines()]
     tower_map = TowerMap(grid)
     antinodes = tower_map.get_antinodes()
     print(f"[Part one] Number of antinodes {len(antinodes)}")
 
-    antinodes = tower_map.get_antinodes_with_resonant_harmonics()
-    print(f"[Part two] Number of antinodes {len(antinodes)}")
+    antinodes = tower_map.get_antinode_bitmap_with_resonant_harmonics()
+    print(f"[Part two] Number of antinodes {sum(antinodes)}")
 
 
 if __name__ == "__main__":
@@ -1,88 +1,8 @@
 import sys
-
-class Disk:
-    blocks: list[int | None]
-
-    def __init__(self, disk_map: str):
-        self.blocks = []
-        for i, size in enumerate(disk_map):
-            if i % 2 != 0:
-                self.blocks += [None] * int(size)
-            else:
-                self.blocks += [int(i/2)] * int(size)
-
-    def __iter__(self):
-        return self.blocks.__iter__()
-
-    def __getitem__(self, index: int) -> int | None:
-        return self.blocks[index]
-
-    def __setitem__(self, index: int, value: int | None) -> None:
-        self.blocks[index] = value
-
-    def __len__(self) -> int:
-        return len(self.blocks)
-
-    def move(self, src: int, dest: int, size: int) -> None:
-        for i in range(size):
-            self.blocks[dest + i] = self.blocks[src + i]
-            self.blocks[src + i] = None
-
-    def checksum(self) -> int:
-        checksum = 0
-        for position, file_id in enumerate(self.blocks):
-            if file_id is not None:
-                checksum += position * file_id
-        return checksum
-
-    def gaps(self) -> list[range]:
-        gaps = []
-        gap_start = None
-        for i, block in enumerate(self.blocks):
-            # We have reached the start of a gap.
-            if block is None and gap_start is None:
-                gap_start = i
-            # We have reached the end of a gap.
-            elif block is not None and gap_start is not None:
-                gaps.append(range(gap_start, i))
-                gap_start = None
-
-        # Check if there is a final gap at the end of the disk.
-        if gap_start is not None:
-            gaps.append(range(gap_start, len(self.blocks)))
-
-        return gaps
-
-    def files(self) -> list["File"]:
-        files = []
-        file = None
-        for i, id in enumerate(self.blocks):
-            if file is None:
-                # Skip all null values if we haven't yet found a file.
-                if id is None:
-                    continue
-                file = File(i, 1, id)
-            else:
-                # If we just finished looping through a set of blocks from the same
-                # file.
-                if id != file.id:
-                    # Move the blocks into the gap, as long as it will fit.
-                    files.append(file)
-
-                    if id is not None:
-                        # Create a new file if both files are lined up with no gap.
-                        file = File(i, 1, id)
-                    else:
-                        file = None
-                else:
-                    file.size += 1
-
-        # Check if there is a final file at the end of the disk.
-        if file is not None:
-            files.append(file)
-
-        return files
-
+from collections import defaultdict
+from heapq import heappop, heappush
+from typing import Iterable, Iterator
+from unittest import TestCase
 
 class File:
     position: int
@@ -94,56 +14,152 @@ class File:
         self.size = size
         self.id = id
 
-    def move(self, disk: Disk, target: int) -> None:
-        disk.move(self.position, target, self.size)
+    def checksum(self) -> int:
+        # Sum of the block positions covered by the file, as an arithmetic
+        # series, multiplied by the file ID.
+        return self.id * (self.size * self.position + self.size * (self.size - 1) // 2)
+
+
+class GapIndex:
+    """
+    The free gaps on a disk, grouped by size. Each group is a heap of gap
+    positions, so the leftmost gap that fits a file is found by looking at the
+    first gap of each group that is large enough.
+    """
+    gaps: dict[int, list[int]]
+
+    def __init__(self) -> None:
+        self.gaps = defaultdict(list)
+
+    def add(self, position: int, size: int) -> None:
+        if size > 0:
+            heappush(self.gaps[size], position)
+
+    def take(self, size: int, before: int) -> int | None:
+        """
+        Claim space for a file from the leftmost gap that can fit it and starts
+        before the given position. Any leftover space stays in the index as a
+        smaller gap. Returns the position of the claimed space, or None if no
+        gap fits.
+        """
+        best = None
+        for gap_size, positions in self.gaps.items():
+            if gap_size < size or not positions or positions[0] >= before:
+                continue
+            if best is None or positions[0] < best[0]:
+                best = (positions[0], gap_size)
+
+        if best is None:
+            return None
+
+        position, gap_size = best
+        heappop(self.gaps[gap_size])
+        self.add(position + size, gap_size - size)
+        return position
+
+
+def iter_spans(disk_map: Iterable[str]) -> Iterator[tuple[int | None, int, int]]:
+    """
+    Go through the disk map one span at a time, without expanding it into
+    individual blocks. Each span is a file ID, or None for a gap, along with
+    its position and size.
+    """
+    position = 0
+    for i, size in enumerate(disk_map):
+        size = int(size)
+        if size > 0:
+            yield (None if i % 2 != 0 else i // 2), position, size
+        position += size
+
+
+def parse_spans(disk_map: Iterable[str]) -> tuple[list[File], GapIndex]:
+    """
+    Read the disk map into a list of file spans and an index of the free gaps.
+    """
+    files = []
+    gaps = GapIndex()
+    gap = None
+    for id, position, size in iter_spans(disk_map):
+        if id is None:
+            # Gaps only separated by an empty file are a single free span.
+            if gap is not None:
+                gap = (gap[0], gap[1] + size)
+            else:
+                gap = (position, size)
+        else:
+            if gap is not None:
+                gaps.add(*gap)
+                gap = None
+            files.append(File(position, size, id))
+
+    if gap is not None:
+        gaps.add(*gap)
+    return files, gaps
+
+
+def compact_blocks(disk_map: Iterable[str]) -> list[File]:
+    """
+    Fill each gap, from left to right, with blocks taken from the end of the
+    rightmost file. Files are split into separate spans when only part of them
+    fits in a gap.
+    """
+    files = []
+    gaps = []
+    for id, position, size in iter_spans(disk_map):
+        if id is None:
+            gaps.append((position, size))
+        else:
+            files.append(File(position, size, id))
+
+    moved = []
+    for gap_position, gap_size in gaps:
+        while gap_size > 0 and files and files[-1].position > gap_position:
+            file = files[-1]
+            size = min(gap_size, file.size)
+            moved.append(File(gap_position, size, file.id))
+            gap_position += size
+            gap_size -= size
+
+            # The blocks are taken from the end of the file.
+            file.size -= size
+            if file.size == 0:
+                files.pop()
+
+    return files + moved
+
+
+def compact_files(disk_map: str) -> list[File]:
+    """
+    Move each whole file, starting from the highest file ID, into the leftmost
+    gap that can fit it.
+    """
+    files, gaps = parse_spans(disk_map)
+    for file in reversed(files):
+        position = gaps.take(file.size, file.position)
+        if position is not None:
+            # The space freed by the file is never reused, since every file
+            # left to move is further to the left.
+            file.position = position
+    return files
 
 
 def main():
     disk_map = sys.stdin.readline().strip()
 
     # Rearrange the blocks on the disk.
-    disk = Disk(disk_map)
-    i = 0
-    j = len(disk) - 1
-    while i < j:
-        if disk[i] != None:
-            i += 1
-            continue
-
-        if disk[j] == None:
-            j -= 1
-            continue
-
-        disk[i] = disk[j]
-        disk[j] = None
-        i += 1
-        j -= 1
-
-    print("[Part one] Filesystem checksum:", disk.checksum())
-
-    disk = Disk(disk_map)
-    gaps = list(reversed(disk.gaps()))
-    while gaps:
-        gap = gaps.pop()
-
-        files = reversed(disk.files())
-        for file in files:
-            # Skip all files the start before the end of this gap.
-            if file.position < gap.stop:
-                break
-            # The file will fit into the gap with room to spare. The remaining
-            # room can be used as a future gap.
-            elif file.size < len(gap):
-                file.move(disk, gap.start)
-                gaps.append(range(gap.start + file.size, gap.stop))
-                break
-            # The file will fit into the gap exactly.
-            elif file.size == len(gap):
-                file.move(disk, gap.start)
-                break
-
-    print("[Part two] Filesystem checksum:", disk.checksum())
+    files = compact_blocks(disk_map)
+    print("[Part one] Filesystem checksum:", sum(file.checksum() for file in files))
+
+    files = compact_files(disk_map)
+    print("[Part two] Filesystem checksum:", sum(file.checksum() for file in files))
+
 
+class CompactFilesTestCase(TestCase):
+    def test_empty_file_between_gaps(self):
+        # The empty file 1 doesn't split the free space after file 0, so file 2
+        # fits into it.
+        files = compact_files("03014")
+        self.assertEqual(sum(file.checksum() for file in files), 12)
 
 if __name__ == "__main__":
     main()
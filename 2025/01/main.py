@@ -1,58 +1,63 @@
 import sys
+from array import array
+from itertools import accumulate, compress, pairwise
 
 def main():
-    lines = sys.stdin.readlines()
-    part1(lines)
-    part2(lines)
-
-def part1(lines):
-    position = 50
-    password = 0
+    rotations = parse_rotations(sys.stdin)
+    positions = get_positions(rotations)
+    part1(positions)
+    part2(rotations, positions)
 
+def parse_rotations(lines) -> array:
+    """
+    Parse every instruction once into a signed rotation, where turning right is
+    positive and turning left is negative.
+    """
+    rotations = array("q")
     for line in lines:
         line = line.strip()
         if line[0] == "R":
-            position += int(line[1:])
+            rotations.append(int(line[1:]))
         elif line[0] == "L":
-            position -= int(line[1:])
+            rotations.append(-int(line[1:]))
         else:
             raise ValueError(f"Invalid instruction {line}")
+    return rotations
 
-        position %= 100
-        if position == 0:
-            password += 1
-
-    print(f"[Part One] Password is {password}")
+def get_positions(rotations: array) -> list[int]:
+    """
+    Get the dial position before and after every rotation, without wrapping
+    the dial around. Wrapping the position is just a modulo, so keeping the
+    running total lets both parts work from the same positions.
+    """
+    return list(accumulate(rotations, initial=50))
 
-def part2(lines):
-    position = 50
-    password = 0
+def part1(positions: list[int]):
+    password = sum(position % 100 == 0 for position in positions[1:])
 
-    for line in lines:
-        line = line.strip()
-        if line[0] == "R":
-            # If we are turning right, any change in digits above the hundreds
-            # indicates we are going over the zero position again.
-            initial_iterations = position // 100
-            position += int(line[1:])
-            new_iterations = position // 100
-            password += new_iterations - initial_iterations
-        elif line[0] == "L":
-            # If we are turning left, we follow the same rule unless the
-            # starting or ending position is exactly zero. Moving to the ending
-            # position of zero is considered an extra step down. Going
-            # backwards from a starting position of zero doesn't count as a
-            # step down since the zero was already passed by the previous
-            # iteration. We subtract one from both the starting and ending
-            # position to account for this.
-            initial_iterations = (position - 1) // 100
-            position -= int(line[1:])
-            new_iterations = (position - 1) // 100
-            password +=  initial_iterations - new_iterations
-        else:
-            raise ValueError(f"Invalid instruction {line}")
+    print(f"[Part One] Password is {password}")
 
-        position %= 100
+def part2(rotations: array, positions: list[int]):
+    # If we are turning right, any change in digits above the hundreds
+    # indicates we are going over the zero position again.
+    #
+    # If we are turning left, we follow the same rule unless the starting or
+    # ending position is exactly zero. Moving to the ending position of zero is
+    # considered an extra step down. Going backwards from a starting position
+    # of zero doesn't count as a step down since the zero was already passed
+    # by the previous iteration. We subtract one from both the starting and
+    # ending position to account for this.
+    steps = list(pairwise(positions))
+    right = [rotation > 0 for rotation in rotations]
+    left = [rotation < 0 for rotation in rotations]
+    password = sum(
+        new // 100 - initial // 100
+        for initial, new in compress(steps, right)
+    )
+    password += sum(
+        (initial - 1) // 100 - (new - 1) // 100
+        for initial, new in compress(steps, left)
+    )
 
     print(f"[Part Two] Password is {password}")
 
@@ -1,4 +1,3 @@
-import itertools
 import sys
 from typing import Generator
 
@@ -8,43 +7,123 @@ class IDRange:
         self.end = end
 
     def get_pairs(self) -> Generator[int, None, None]:
-        for i in range(self.start, self.end + 1):
-            i_str = str(i)
-            if len(i_str) % 2 != 0:
-                continue
-
-            pivot = len(i_str) // 2
-            if i_str[pivot:] == i_str[:pivot]:
-                yield i
+        for length in self.get_lengths():
+            if length % 2 == 0:
+                yield from self.get_patterns(length, length // 2)
 
     def get_repeated(self) -> Generator[int, None, None]:
-        for i in range(self.start, self.end + 1):
-            i_str = str(i)
-
-            for divisor in range(1, len(i_str)):
-                if len(i_str) % divisor != 0:
+        """
+        Generate every ID in the range made of a pattern repeated at least
+        twice. Each ID is only generated once, for its shortest pattern, but
+        the IDs aren't generated in order.
+        """
+        for length in self.get_lengths():
+            for period in range(1, length):
+                if length % period != 0:
                     continue
 
-                if self.is_repeated(i_str, divisor):
-                    yield i
-                    break
+                for value in self.get_patterns(length, period):
+                    pattern = value // self.get_multiplier(length, period)
+                    if not self.is_shorter_pattern(pattern, period):
+                        yield value
+
+    def sum_pairs(self) -> int:
+        return sum(
+            self.sum_patterns(length, length // 2)
+            for length in self.get_lengths()
+            if length % 2 == 0
+        )
+
+    def sum_repeated(self) -> int:
+        """
+        Sum every ID in the range made of a pattern repeated at least twice,
+        without visiting the IDs. An ID repeated with a period is also
+        repeated with every multiple of that period that divides the length,
+        so only the periods length / prime are needed, combined with
+        inclusion-exclusion over the primes.
+        """
+        total = 0
+        for length in self.get_lengths():
+            primes = get_prime_factors(length)
+            for mask in range(1, 1 << len(primes)):
+                divisor = 1
+                for i, prime in enumerate(primes):
+                    if mask & (1 << i):
+                        divisor *= prime
+
+                sign = 1 if mask.bit_count() % 2 == 1 else -1
+                total += sign * self.sum_patterns(length, length // divisor)
+        return total
+
+    def get_lengths(self) -> range:
+        return range(len(str(self.start)), len(str(self.end)) + 1)
 
     @classmethod
-    def is_repeated(cls, value: str, divisor: int) -> bool:
-        chunks = list(itertools.batched(value, divisor))
-        for chunk in chunks[1:]:
-            if chunks[0] != chunk:
-                return False
-        return True
+    def get_multiplier(cls, length: int, period: int) -> int:
+        """
+        Get the number that repeats a pattern of `period` digits to fill
+        `length` digits when multiplied by it, such as 10101 for a period of 2
+        and a length of 6.
+        """
+        return (10 ** length - 1) // (10 ** period - 1)
+
+    def get_pattern_range(self, length: int, period: int) -> range:
+        """
+        Get the range of patterns that, repeated to `length` digits, give an ID
+        within this range.
+        """
+        multiplier = self.get_multiplier(length, period)
+        start = max(self.start, 10 ** (length - 1))
+        end = min(self.end, 10 ** length - 1)
+        lowest = max(10 ** (period - 1), -(-start // multiplier))
+        highest = min(10 ** period - 1, end // multiplier)
+        return range(lowest, highest + 1)
+
+    def get_patterns(self, length: int, period: int) -> Generator[int, None, None]:
+        multiplier = self.get_multiplier(length, period)
+        for pattern in self.get_pattern_range(length, period):
+            yield pattern * multiplier
+
+    def sum_patterns(self, length: int, period: int) -> int:
+        patterns = self.get_pattern_range(length, period)
+        if not patterns:
+            return 0
+        pattern_sum = (patterns.start + patterns.stop - 1) * len(patterns) // 2
+        return pattern_sum * self.get_multiplier(length, period)
+
+    @classmethod
+    def is_shorter_pattern(cls, value: int, length: int) -> bool:
+        """
+        Check if a number with `length` digits is itself a shorter pattern
+        repeated.
+        """
+        return any(
+            length % period == 0 and value % cls.get_multiplier(length, period) == 0
+            for period in range(1, length)
+        )
+
+
+def get_prime_factors(value: int) -> list[int]:
+    primes = []
+    factor = 2
+    while factor * factor <= value:
+        if value % factor == 0:
+            primes.append(factor)
+            while value % factor == 0:
+                value //= factor
+        factor += 1
+    if value > 1:
+        primes.append(value)
+    return primes
 
 
-def part1(ranges: list[str]):
-    invalid_sum = sum(sum(id_range.get_pairs()) for id_range in ranges)
+def part1(ranges: list[IDRange]):
+    invalid_sum = sum(id_range.sum_pairs() for id_range in ranges)
     print(f"[Part One] Invalid sum {invalid_sum}")
 
 
-def part2(ranges: list[str]):
-    invalid_sum = sum(sum(id_range.get_repeated()) for id_range in ranges)
+def part2(ranges: list[IDRange]):
+    invalid_sum = sum(id_range.sum_repeated() for id_range in ranges)
     print(f"[Part Two] Invalid sum {invalid_sum}")
 
 
@@ -3,10 +3,28 @@ import sys
 
 class BatteryBank:
     bank: list[int]
+    max_positions: list[list[int]]
 
     def __init__(self, line: str) -> None:
         self.bank = [int(char) for char in line]
 
+        # Build a sparse table, where max_positions[j][i] is the position of
+        # the largest battery in bank[i:i + 2 ** j], preferring the leftmost
+        # one on ties. Any range can then be answered by combining two
+        # overlapping entries.
+        self.max_positions = [list(range(len(self.bank)))]
+        width = 1
+        while width * 2 <= len(self.bank):
+            previous = self.max_positions[-1]
+            self.max_positions.append([
+                self.leftmost_max(previous[i], previous[i + width])
+                for i in range(len(self.bank) - width * 2 + 1)
+            ])
+            width *= 2
+
+    def leftmost_max(self, a: int, b: int) -> int:
+        return b if self.bank[b] > self.bank[a] else a
+
     def get_largest_joltage(self, battery_count: int) -> int:
         joltage = 0
         start = 0
@@ -15,22 +33,21 @@ class BatteryBank:
             # already passed over previously, and leave at least enough
             # elements at the end to find the remaining a
             end = len(self.bank) - battery_count + 1 + i
-            bank = self.bank[start:end]
-            position = self.find_max_value_position(bank)
+            position = self.find_max_value_position(start, end)
 
-            joltage = (joltage * 10) + bank[position]
-            start += position + 1
+            joltage = (joltage * 10) + self.bank[position]
+            start = position + 1
 
         return joltage
 
-    def find_max_value_position(self, bank: list[int]) -> int:
-        max_jolts = 0
-        position = 0
-        for i, jolts in enumerate(bank):
-            if jolts > max_jolts:
-                max_jolts = jolts
-                position = i
-        return position
+    def find_max_value_position(self, start: int, end: int) -> int:
+        """
+        Find the position of the largest battery in bank[start:end], using the
+        sparse table instead of scanning the range.
+        """
+        level = (end - start).bit_length() - 1
+        positions = self.max_positions[level]
+        return self.leftmost_max(positions[start], positions[end - (1 << level)])
 
 
 
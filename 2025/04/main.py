@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from operator import add
 import sys
 
 @dataclass
@@ -66,26 +67,89 @@ class Grid:
         if roll_count <= 4:
             return True
 
+    def get_roll_counts(self) -> list[list[int]]:
+        """
+        Count the rolls in the 3x3 square around every cell at once, including
+        the cell itself. The grid is padded with an empty border, then each row
+        is added to its shifted copies, first horizontally and then vertically.
+        """
+        padded = [[0] * (self.bounds.width + 2)]
+        padded += [[0, *row, 0] for row in self.rolls]
+        padded += [[0] * (self.bounds.width + 2)]
+
+        rows = [
+            list(map(add, map(add, row[:-2], row[1:-1]), row[2:]))
+            for row in padded
+        ]
+        return [
+            list(map(add, map(add, above, row), below))
+            for above, row, below in zip(rows, rows[1:], rows[2:])
+        ]
+
+    def count_accessible_rolls(self) -> int:
+        return sum(
+            roll and count <= 4
+            for counts, rolls in zip(self.get_roll_counts(), self.rolls)
+            for count, roll in zip(counts, rolls)
+        )
+
     def remove_roll(self, location: Location) -> bool:
         self.rolls[location.y][location.x] = False
 
+    def get_neighbors(self, location: Location) -> list[Location]:
+        return [
+            neighbor
+            for x in [-1, 0, 1]
+            for y in [-1, 0, 1]
+            if (x, y) != (0, 0)
+            and (neighbor := location + Location(x, y)) in self.bounds
+        ]
+
+    def peel_rolls(self) -> list[int]:
+        """
+        Keep removing accessible rolls until none are left, returning the
+        number of rolls removed in each round. The neighbor counts are only
+        calculated once, and removing a roll just updates the counts of its
+        neighbors, so only rolls next to a removed roll are checked again.
+        """
+        width = self.bounds.width
+        neighbors = {}
+        counts = {}
+        for location in self.bounds:
+            if self.is_roll(location):
+                index = location.y * width + location.x
+                neighbors[index] = [
+                    neighbor.y * width + neighbor.x
+                    for neighbor in self.get_neighbors(location)
+                    if self.is_roll(neighbor)
+                ]
+                counts[index] = len(neighbors[index])
+
+        # A roll is accessible with fewer than four neighboring rolls.
+        queued = {index for index, count in counts.items() if count < 4}
+        accessible = list(queued)
+        rounds = []
+        while accessible:
+            rounds.append(len(accessible))
+            next_accessible = []
+            for index in accessible:
+                self.rolls[index // width][index % width] = False
+                for neighbor in neighbors[index]:
+                    counts[neighbor] -= 1
+                    if counts[neighbor] < 4 and neighbor not in queued:
+                        queued.add(neighbor)
+                        next_accessible.append(neighbor)
+            accessible = next_accessible
+
+        return rounds
+
 
 def main():
     lines = sys.stdin.readlines()
     grid = Grid(lines)
-    locations = grid.get_accessible_rolls()
-    print(f"[Part one] Accessible rolls {len(locations)}")
-
-    removed = 0
-    while True:
-        locations = grid.get_accessible_rolls()
-        if len(locations) == 0:
-            break
-
-        for location in locations:
-            grid.remove_roll(location)
-            removed += 1
+    print(f"[Part one] Accessible rolls {grid.count_accessible_rolls()}")
 
+    removed = sum(grid.peel_rolls())
     print(f"[Part two] Removable rolls {removed}")
 
 
@@ -1,5 +1,7 @@
 import sys
+from bisect import bisect_left, bisect_right
 from dataclasses import dataclass
+from unittest import TestCase
 
 @dataclass(frozen=True)
 class Range:
@@ -24,6 +26,150 @@ class Range:
         return self.end - self.start + 1
 
 
+class RangeIndex:
+    """
+    A sorted list of non-overlapping ranges, built once from any list of
+    ranges by merging the ones that overlap. Lookups use a binary search over
+    the range starts.
+    """
+    ranges: list[Range]
+    starts: list[int]
+
+    def __init__(self, ranges: list[Range]) -> None:
+        self.ranges = []
+        for next_range in sorted(ranges, key=lambda r: r.start):
+            if self.ranges and self.ranges[-1].overlaps(next_range):
+                self.ranges[-1] = self.ranges[-1].merge(next_range)
+            else:
+                self.ranges.append(next_range)
+        self.starts = [r.start for r in self.ranges]
+
+    def __contains__(self, ingredient_id: int) -> bool:
+        i = bisect_right(self.starts, ingredient_id) - 1
+        return i >= 0 and ingredient_id in self.ranges[i]
+
+    def __len__(self) -> int:
+        return sum(len(r) for r in self.ranges)
+
+    def count_contained(self, ingredient_ids: list[int]) -> int:
+        """
+        Count how many of the ingredient IDs fall within a range, by walking
+        the sorted IDs and the sorted ranges together.
+        """
+        count = 0
+        i = 0
+        for ingredient_id in sorted(ingredient_ids):
+            while i < len(self.ranges) and self.ranges[i].end < ingredient_id:
+                i += 1
+            if i == len(self.ranges):
+                break
+            if ingredient_id in self.ranges[i]:
+                count += 1
+        return count
+
+
+class RangeSet(RangeIndex):
+    """
+    A range index that can be changed after it's built. Inserting a range
+    merges it with the ranges it overlaps, and removing a range trims or splits
+    the ranges it overlaps, so only the affected ranges are touched. Both are
+    found with a binary search, and the covered length is kept up to date as
+    the set changes.
+    """
+    ends: list[int]
+    length: int
+
+    def __init__(self, ranges: list[Range] | None=None) -> None:
+        super().__init__(ranges or [])
+        self.ends = [r.end for r in self.ranges]
+        self.length = super().__len__()
+
+    def __len__(self) -> int:
+        return self.length
+
+    def find_overlapping(self, other: Range) -> tuple[int, int]:
+        """
+        Get the slice of ranges that overlap with another range. Since the
+        ranges don't overlap each other, both their starts and ends are sorted.
+        """
+        return bisect_left(self.ends, other.start), bisect_right(self.starts, other.end)
+
+    def replace(self, lo: int, hi: int, ranges: list[Range]) -> None:
+        self.length -= sum(len(r) for r in self.ranges[lo:hi])
+        self.length += sum(len(r) for r in ranges)
+        self.ranges[lo:hi] = ranges
+        self.starts[lo:hi] = [r.start for r in ranges]
+        self.ends[lo:hi] = [r.end for r in ranges]
+
+    def insert(self, new_range: Range) -> None:
+        lo, hi = self.find_overlapping(new_range)
+        if lo < hi:
+            new_range = new_range.merge(self.ranges[lo]).merge(self.ranges[hi - 1])
+        self.replace(lo, hi, [new_range])
+
+    def remove(self, old_range: Range) -> None:
+        lo, hi = self.find_overlapping(old_range)
+        if lo == hi:
+            return
+
+        # Keep whatever is left of the first and last ranges outside of the
+        # removed range.
+        remaining = []
+        first = self.ranges[lo]
+        last = self.ranges[hi - 1]
+        if first.start < old_range.start:
+            remaining.append(Range(first.start, old_range.start - 1))
+        if last.end > old_range.end:
+            remaining.append(Range(old_range.end + 1, last.end))
+        self.replace(lo, hi, remaining)
+
+
+class RangeSetTestCase(TestCase):
+    def setUp(self):
+        self.ranges = RangeSet([Range(1, 3), Range(6, 8), Range(12, 14)])
+
+    def test_insert_merges_ranges(self):
+        self.ranges.insert(Range(2, 12))
+        self.assertEqual(self.ranges.ranges, [Range(1, 14)])
+        self.assertEqual(len(self.ranges), 14)
+        self.assertIn(10, self.ranges)
+        self.assertNotIn(15, self.ranges)
+
+    def test_insert_separate_range(self):
+        self.ranges.insert(Range(20, 21))
+        self.assertEqual(len(self.ranges), 11)
+        self.assertIn(21, self.ranges)
+        self.assertNotIn(19, self.ranges)
+
+    def test_remove_splits_range(self):
+        self.ranges.remove(Range(7, 7))
+        self.assertEqual(self.ranges.ranges, [Range(1, 3), Range(6, 6), Range(8, 8), Range(12, 14)])
+        self.assertEqual(len(self.ranges), 8)
+        self.assertIn(6, self.ranges)
+        self.assertNotIn(7, self.ranges)
+        self.assertIn(8, self.ranges)
+
+    def test_remove_across_ranges(self):
+        self.ranges.remove(Range(2, 13))
+        self.assertEqual(self.ranges.ranges, [Range(1, 1), Range(14, 14)])
+        self.assertEqual(len(self.ranges), 2)
+        self.assertIn(1, self.ranges)
+        self.assertNotIn(7, self.ranges)
+        self.assertIn(14, self.ranges)
+
+    def test_insert_then_remove(self):
+        # Adjacent ranges don't overlap, so they're kept separate.
+        self.ranges.insert(Range(4, 5))
+        self.assertEqual(self.ranges.ranges, [Range(1, 3), Range(4, 5), Range(6, 8), Range(12, 14)])
+        self.assertEqual(len(self.ranges), 11)
+        self.assertIn(5, self.ranges)
+
+        self.ranges.remove(Range(0, 20))
+        self.assertEqual(self.ranges.ranges, [])
+        self.assertEqual(len(self.ranges), 0)
+        self.assertNotIn(4, self.ranges)
+
+
 def main():
     fresh_ranges: list[Range] = []
     for line in sys.stdin:
@@ -36,26 +182,11 @@ def main():
     for line in sys.stdin:
         ingredients.append(int(line.strip()))
 
-    fresh_count = 0
-    for ingredient in ingredients:
-        for fresh_range in fresh_ranges:
-            if ingredient in fresh_range:
-                fresh_count += 1
-                break
-
+    fresh_index = RangeIndex(fresh_ranges)
+    fresh_count = fresh_index.count_contained(ingredients)
     print(f"[Part one] Number of fresh ingredients {fresh_count}")
 
-    merged_ranges = set()
-    for fresh_range in fresh_ranges:
-        for next_range in list(merged_ranges):
-            if fresh_range.overlaps(next_range):
-                merged_ranges.remove(next_range)
-                fresh_range = fresh_range.merge(next_range)
-
-        merged_ranges.add(fresh_range)
-
-    fresh_ids = sum(len(fresh_range) for fresh_range in merged_ranges)
-    print(f"[Part two] Number of fresh IDs {fresh_ids}")
+    print(f"[Part two] Number of fresh IDs {len(fresh_index)}")
 
 if __name__ == "__main__":
     main()